@@ -37,23 +37,25 @@ import glob
 import http.client
 import json
 import time
-import base64
 import shutil
-import urllib.error
-import urllib.request
-import asyncio
 import hashlib
-import tarfile
 import tomllib
 import platform
 import importlib
 import importlib.util
-import subprocess
+import threading
+import concurrent.futures
 
 from datetime import datetime
 from contextlib import contextmanager
 
-from cryptography.fernet import Fernet
+try:
+    from orjson import loads as json_loads, dumps as json_dumps
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
 
 
 CONFIG_PATH = "/etc/pyk/config.toml"
@@ -83,26 +85,198 @@ TOML_NAME = "pyk.toml"
 JSON_NAME = "pyk.json"
 LOCK_NAME = "pyk.lock"
 CACHE_DIR = os.path.expanduser("~/.cache/pyk")
+WHEELS_DIR = os.path.join(CACHE_DIR, "wheels")
 NODE = platform.node()
 
+_connections = threading.local()
+
+_synced = {}
+_sync_lock = threading.Lock()
+
 
 class Crypto:
+    """Authenticated AES-256-GCM encryption. The data is encrypted in frames of up to 64 KiB,
+       so that it can be decrypted while it is read from a stream. A message starts with a
+       random nonce prefix, every frame with a 4-byte header that holds the size of the frame
+       and a flag that marks the last one. The nonce of a frame is the prefix followed by the
+       frame's index, and its header is authenticated along with it, so frames cannot be
+       reordered, dropped or cut off at the end unnoticed.
+    """
+
+    __slots__ = ()
+
+    PREFIX_SIZE = 8
+    HEADER_SIZE = 4
+    TAG_SIZE = 16
+    FRAME_SIZE = 1 << 16
+    LAST_FRAME = 1 << 31
+
+    aead = None
 
     def __init__(self):
-        hashed_key = hashlib.sha256(KEY).digest()
-        self.fernet = Fernet(base64.b64encode(hashed_key))
+        # The key never changes, so derive it only once per process.
+        if Crypto.aead is None:
+            # pylint:disable=import-outside-toplevel
+            from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+            Crypto.aead = AESGCM(hashlib.sha256(KEY).digest())
+
+    @classmethod
+    def nonce(cls, prefix, index):
+        return prefix + index.to_bytes(12 - cls.PREFIX_SIZE, "big")
 
     def encrypt(self, data):
-        return self.fernet.encrypt(data)
+        prefix = os.urandom(self.PREFIX_SIZE)
+        chunks = [prefix]
+
+        data = memoryview(data)
+        count = max(1, -(-len(data) // self.FRAME_SIZE))
+        for index in range(count):
+            frame = data[index * self.FRAME_SIZE:(index + 1) * self.FRAME_SIZE]
+            size = len(frame) + self.TAG_SIZE
+            if index == count - 1:
+                size |= self.LAST_FRAME
+            header = size.to_bytes(self.HEADER_SIZE, "big")
+            chunks.append(header)
+            chunks.append(self.aead.encrypt(self.nonce(prefix, index), frame, header))
+
+        return b"".join(chunks)
 
     def decrypt(self, data):
-        return self.fernet.decrypt(data)
+        with self.open(io.BytesIO(data)) as fobj:
+            return fobj.read()
+
+    def open(self, fobj):
+        """Return a buffered file object that reads and decrypts the data from fobj frame by
+           frame.
+        """
+        return io.BufferedReader(DecryptReader(self, fobj), buffer_size=self.FRAME_SIZE)
+
+
+class DecryptReader(io.RawIOBase):
+    """Raw file object that decrypts the frames of a message from Crypto.encrypt() while they
+       are read from fobj. The data of a frame is only returned after it was authenticated.
+    """
+
+    def __init__(self, crypto, fobj):
+        super().__init__()
+        self.crypto = crypto
+        self.fobj = fobj
+        self.prefix = None
+        self.index = 0
+        self.frame = memoryview(b"")
+        self.done = False
+
+    def readable(self):
+        return True
+
+    def read_exactly(self, size):
+        chunks = []
+        while size > 0:
+            if not (chunk := self.fobj.read(size)):
+                raise ValueError("encrypted data is truncated")
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def read_frame(self):
+        if self.prefix is None:
+            self.prefix = self.read_exactly(self.crypto.PREFIX_SIZE)
+
+        header = self.read_exactly(self.crypto.HEADER_SIZE)
+        size = int.from_bytes(header, "big")
+        last = size & self.crypto.LAST_FRAME
+        size &= ~self.crypto.LAST_FRAME
+        if not self.crypto.TAG_SIZE <= size <= self.crypto.FRAME_SIZE + self.crypto.TAG_SIZE:
+            raise ValueError("invalid encrypted frame")
+
+        ciphertext = self.read_exactly(size)
+        self.frame = memoryview(self.crypto.aead.decrypt(self.crypto.nonce(self.prefix, self.index),
+                                                         ciphertext, header))
+        self.index += 1
+
+        if last:
+            if self.fobj.read(1):
+                raise ValueError("unexpected data after the last encrypted frame")
+            self.done = True
+
+    def readinto(self, b):
+        while not self.frame and not self.done:
+            self.read_frame()
+
+        size = min(len(b), len(self.frame))
+        b[:size] = self.frame[:size]
+        self.frame = self.frame[size:]
+        return size
+
+
+def get_connection(host, port):
+    """Return a persistent connection to host:port. Connections are kept per thread, because
+       http.client connections must not be shared between threads.
+    """
+    try:
+        cache = _connections.cache
+    except AttributeError:
+        cache = _connections.cache = {}
+
+    try:
+        return cache[host, port]
+    except KeyError:
+        conn = cache[host, port] = http.client.HTTPConnection(host, port)
+        return conn
+
+
+def close_connections():
+    """Close the persistent connections of the calling thread.
+    """
+    for conn in getattr(_connections, "cache", {}).values():
+        conn.close()
+    _connections.cache = {}
+
+
+def open_request(conn, path, headers):
+    """Send a GET request for path over the keep-alive connection conn and return the response.
+       The response must be read completely before conn is used again, or conn must be closed.
+    """
+    try:
+        try:
+            conn.request("GET", path, headers=headers)
+            return conn.getresponse()
+        except (http.client.BadStatusLine, ConnectionResetError, BrokenPipeError):
+            # The server may have closed the idle keep-alive connection, reconnect once.
+            conn.close()
+            conn.request("GET", path, headers=headers)
+            return conn.getresponse()
+    except Exception:
+        conn.close()
+        raise
+
+
+def send_request(conn, path, headers):
+    """Send a GET request for path over the keep-alive connection conn and return the response
+       status and body.
+    """
+    response = open_request(conn, path, headers)
+    try:
+        return response.status, response.read()
+    except Exception:
+        conn.close()
+        raise
+
+
+def http_get(host, port, path, headers):
+    """Send a GET request for path over the persistent connection to host:port and return the
+       response status and body.
+    """
+    return send_request(get_connection(host, port), path, headers)
 
 
 class Logfile:
     """Log file class that buffers messages until a file is connected.
     """
 
+    __slots__ = ("buffer", "debug", "fobj")
+
     def __init__(self, debug=False):
         self.buffer = io.StringIO()
         self.debug = debug
@@ -119,62 +293,120 @@ class Logfile:
         else:
             fobj = self.fobj
 
-        print(message, file=fobj, flush=True)
+        print(message, file=fobj)
 
         if self.debug:
             print(f"PYK: {message}", file=sys.stderr, flush=True)
 
+    def flush(self):
+        if self.buffer is None:
+            self.fobj.flush()
+
 
 class Package:
 
     # XXX make this python version aware?
 
+    # A Package is created for every pyk.* import.
+    __slots__ = ("name", "lib", "logfile", "paths", "base_dir", "package_dir",
+                 "dependencies_dir", "lock_path", "json_path", "config",
+                 "_config_loaded", "_build_dt")
+
+    # The repository server is the same for all packages, so the connection pool key and the
+    # base url for log messages are set up only once.
+    _host = HOST
+    _port = PORT
+    _url = f"http://{HOST}:{PORT}"
+
     def __init__(self, name, lib=False, debug=False):
         self.name = name
         self.lib = lib
         self.logfile = Logfile(debug)
 
-        self.url = f"http://{HOST}:{PORT}/%s/{'lib' if self.lib else 'run'}/{self.name}"
+        self.paths = {command: f"/{command}/{'lib' if self.lib else 'run'}/{self.name}"
+                      for command in ("info", "download", "watch")}
         self.base_dir = os.path.join(CACHE_DIR, "lib" if self.lib else "run", self.name)
         self.package_dir = os.path.join(self.base_dir, "package")
         self.dependencies_dir = os.path.join(self.base_dir, "dependencies")
         self.lock_path = os.path.join(self.base_dir, LOCK_NAME)
         self.json_path = os.path.join(self.base_dir, JSON_NAME)
 
-        self.crypto = Crypto()
+        self._config_loaded = False
 
     def log(self, message):
         self.logfile.log(message)
 
-    def server_command(self, command):
-        self.log(f"get {self.url % command}")
-        try:
-            request = urllib.request.Request(self.url % command, headers={"Pyk-Node": NODE})
-            with urllib.request.urlopen(request) as response:
-                return json.load(response)
+    def check_response(self, command, status, data):
+        if status == 404:
+            raise NoSuchPackage()
+        elif status != 200:
+            raise http.client.HTTPException(f"server returned status {status} for {command!r}")
+        return data
+
+    def server_request(self, command):
+        path = self.paths[command]
+        self.log(f"get {self._url}{path}")
+        status, data = http_get(self._host, self._port, path, {"Pyk-Node": NODE})
+        return self.check_response(command, status, data)
 
-        except urllib.error.HTTPError as exc:
-            if exc.code == 404:
-                raise NoSuchPackage() from exc
+    def server_command(self, command):
+        return json_loads(self.server_request(command))
 
     def get_remote_version(self):
         return self.server_command("info")["version"]
 
+    @contextmanager
+    def download(self):
+        """Download the package archive and yield a file object that decrypts it while it is
+           received from the server.
+        """
+        path = self.paths["download"]
+        self.log(f"get {self._url}{path}")
+        conn = get_connection(self._host, self._port)
+        response = open_request(conn, path, {"Pyk-Node": NODE})
+        try:
+            if response.status != 200:
+                self.check_response("download", response.status, response.read())
+
+            with Crypto().open(response) as fobj:
+                yield fobj
+
+                # Read what the archive left over, so that the last frame is authenticated and
+                # the connection can be used again.
+                while fobj.read(1 << 16):
+                    pass
+
+        except BaseException:
+            conn.close()
+            raise
+
     @classmethod
     @contextmanager
-    def open_archive(cls, data):
-        with tarfile.open(fileobj=io.BytesIO(data), mode="r:gz") as tar:
+    def open_archive(cls, fobj):
+        # pylint:disable=import-outside-toplevel
+        import gzip
+        import tarfile
+
+        # Open the archive as a stream and put a large buffer in front of the decompressor,
+        # so that tarfile's many small reads do not turn into as many small zlib calls.
+        with gzip.GzipFile(fileobj=fobj) as gz, \
+                tarfile.open(fileobj=io.BufferedReader(gz, buffer_size=1 << 20), mode="r|") as tar:
             yield tar
 
+    @classmethod
+    def read_config(cls, tar):
+        """Return the raw contents of the package info file, which must be the first member of
+           the archive so that it can be read without going through the whole stream.
+        """
+        t = tar.next()
+        if t is None or t.name != JSON_NAME:
+            raise ValueError("not a valid package file")
+        return tar.extractfile(t).read()
+
     @classmethod
     def extract_config(cls, data):
-        with cls.open_archive(data) as tar:
-            for t in tar:
-                if t.name == JSON_NAME:
-                    fobj = tar.extractfile(t)
-                    return json.load(fobj)
-            else:
-                raise ValueError("not a valid package file")
+        with cls.open_archive(io.BytesIO(data)) as tar:
+            return json_loads(cls.read_config(tar))
 
     def sync(self):
         """Check if the remote package was updated. If yes, remove the outdated package from the
@@ -183,9 +415,10 @@ class Package:
         """
         # FIXME detect python version changes.
         self.log(f"check if package {self.name!r} has changed")
+
         try:
             remote_version = self.get_remote_version()
-        except urllib.error.URLError as exc:
+        except (OSError, http.client.HTTPException):
             if os.path.exists(self.json_path):
                 print(f"WARNING: unable to reach {HOST}:{PORT}", file=sys.stderr)
                 print("WARNING: falling back on cached package", file=sys.stderr)
@@ -196,8 +429,8 @@ class Package:
                 sys.exit(123)
 
         try:
-            with open(self.json_path, encoding="utf-8") as fobj:
-                oldconfig = json.load(fobj)
+            with open(self.json_path, "rb") as fobj:
+                oldconfig = json_loads(fobj.read())
         except FileNotFoundError:
             uptodate = False
             oldconfig = {}
@@ -208,52 +441,51 @@ class Package:
 
         if uptodate:
             self.log("package is up-to-date")
-            self.load_config()
+            self.load_config(oldconfig)
             return False
 
+        # The lock file lives in base_dir, so it must exist before the first install, too.
+        os.makedirs(self.base_dir, exist_ok=True)
         try:
             open(self.lock_path, "x").close()
         except FileExistsError:
+            # Someone else is installing the package, check again when they are done.
             while os.path.exists(self.lock_path):
                 time.sleep(1)
-            return
-        except FileNotFoundError:
-            pass
+            return self.sync()
 
         try:
+            # Go through the archive only once while it is downloaded: read the package info
+            # from the first member, prepare the directories and extract the remaining members.
             self.log(f"download package {self.name!r}")
-            data = self.server_command("download")
-            data = self.crypto.decrypt(data["data"])
+            with self.download() as fobj, self.open_archive(fobj) as tar:
+                newconfig = json_loads(self.read_config(tar))
 
-            self.log("prepare virtual environment")
-            newconfig = self.extract_config(data)
-            olddeps = set(oldconfig.get("dependencies", []))
-            newdeps = set(newconfig.get("dependencies", []))
+                self.log("prepare virtual environment")
+                olddeps = set(oldconfig.get("dependencies", []))
+                newdeps = set(newconfig.get("dependencies", []))
 
-            if newdeps != olddeps:
-                try:
-                    shutil.rmtree(self.base_dir)
-                except FileNotFoundError:
-                    pass
-            else:
-                try:
-                    shutil.rmtree(self.package_dir)
-                except FileNotFoundError:
-                    pass
+                # Leave the rest of base_dir alone, it holds our lock file.
+                if newdeps != olddeps:
+                    outdated = [self.package_dir, self.dependencies_dir]
+                else:
+                    outdated = [self.package_dir]
 
-            os.makedirs(self.package_dir, exist_ok=True)
-            os.makedirs(self.dependencies_dir, exist_ok=True)
+                for path in outdated:
+                    try:
+                        shutil.rmtree(path)
+                    except FileNotFoundError:
+                        pass
 
-            self.logfile.connect_file(os.path.join(self.base_dir, "pyk.log"))
+                os.makedirs(self.package_dir, exist_ok=True)
+                os.makedirs(self.dependencies_dir, exist_ok=True)
 
-            self.log(f"extract package {self.name!r} to {self.package_dir!r}")
-            with self.open_archive(data) as tar:
-                tar.extractall(self.base_dir, filter=lambda t, p: t if t.name == JSON_NAME else None)
+                self.logfile.connect_file(os.path.join(self.base_dir, "pyk.log"))
 
-            with self.open_archive(data) as tar:
+                self.log(f"extract package {self.name!r} to {self.package_dir!r}")
                 tar.extractall(self.package_dir, filter=lambda t, p: t if t.name != JSON_NAME else None)
 
-            self.load_config()
+            self.load_config(newconfig)
 
             if newdeps != olddeps:
                 self.prepare_dependencies()
@@ -266,6 +498,7 @@ class Package:
             return True
 
         finally:
+            self.logfile.flush()
             try:
                 os.remove(self.lock_path)
             except FileNotFoundError:
@@ -292,29 +525,79 @@ class Package:
                                                        language_level=3)
             pyxbuild.pyx_to_dll(pyx_file, extension_mod, inplace=True)
 
-    def load_config(self):
-        with open(self.json_path, encoding="utf-8") as fobj:
-            self.config = json.load(fobj)
+    def load_config(self, config=None):
+        """Set the package info from config or from the local package info file, unless it has
+           already been loaded.
+        """
+        if config is None:
+            if self._config_loaded:
+                return
+            with open(self.json_path, "rb") as fobj:
+                config = json_loads(fobj.read())
+
+        self.config = config
+        self._build_dt = datetime.fromisoformat(self.config["build_date"])
+        self._config_loaded = True
 
-        dt = datetime.fromisoformat(self.config["build_date"])
-        self.log(f"build date: {dt:%Y-%m-%d %H:%M:%S}")
+        self.log(f"build date: {self._build_dt:%Y-%m-%d %H:%M:%S}")
         self.log(f"version: {self.config['version']}")
 
     def save_config(self):
+        # pylint:disable=import-outside-toplevel
+        import tempfile
+
         self.config["install_date"] = datetime.now().isoformat()
-        with open(self.json_path, "w", encoding="utf-8") as fobj:
-            json.dump(self.config, fobj, indent=4)
+        # Write to a temporary file and rename it, so that other processes never see a partly
+        # written file. The name must be unique, in case another process saves at the same time.
+        fd, path = tempfile.mkstemp(dir=self.base_dir, prefix=JSON_NAME)
+        try:
+            with os.fdopen(fd, "wb") as fobj:
+                fobj.write(json_dumps(self.config))
+            os.replace(path, self.json_path)
+        except BaseException:
+            os.remove(path)
+            raise
+
+    def pip_install(self, dependencies):
+        # pylint:disable=import-outside-toplevel
+        import subprocess
+
+        # Prefer uv if it is installed, it resolves and installs a lot faster than pip.
+        if shutil.which("uv") is not None:
+            args = ["uv", "pip", "install", "--python", sys.executable,
+                    "--target", self.dependencies_dir, *dependencies]
+        else:
+            args = ["pip", "install", "--no-warn-conflicts", "--cache-dir", WHEELS_DIR,
+                    "--target", self.dependencies_dir, *dependencies]
+        self.log(" ".join(args))
+        # pip writes directly to the file descriptor, so our buffered messages must go first.
+        self.logfile.flush()
+        try:
+            subprocess.check_call(args, stdout=self.logfile.fobj, stderr=subprocess.STDOUT)
+        except subprocess.CalledProcessError:
+            return False
+        else:
+            return True
 
     def prepare_dependencies(self):
-        for dependency in self.config.get("dependencies", []):
-            args = ["pip", "install", "--no-warn-conflicts", "--target", self.dependencies_dir, dependency]
-            self.log(" ".join(args))
-            try:
-                subprocess.check_call(args, stdout=self.logfile.fobj, stderr=subprocess.STDOUT)
-            except subprocess.CalledProcessError:
+        if not (dependencies := self.config.get("dependencies", [])):
+            return
+
+        # Install all dependencies with a single pip call, so that pip has to start up and
+        # resolve only once.
+        if self.pip_install(dependencies):
+            return
+
+        # Something went wrong, install the dependencies one by one to find the culprit.
+        for dependency in dependencies:
+            if not self.pip_install([dependency]):
                 print(f"ERROR: pip install had errors installing {dependency!r}", file=sys.stderr)
-                print(f"ERROR: see {self.logfile.fobj.name!r} for details", file=sys.stderr)
-                sys.exit(123)
+                break
+        else:
+            print("ERROR: pip install had errors installing dependencies", file=sys.stderr)
+
+        print(f"ERROR: see {self.logfile.fobj.name!r} for details", file=sys.stderr)
+        sys.exit(123)
 
     def run(self, argv):
         run = self.config.get("run")
@@ -323,29 +606,46 @@ class Package:
 
         run = os.path.join(self.package_dir, run)
 
-        env = os.environ.copy()
-        env["PYK_VERSION"] = str(self.config["version"])
-        pythonpath = env.get("PYTHONPATH", "").split(os.pathsep)
-        pythonpath = [self.package_dir, self.dependencies_dir] + pythonpath
-        env["PYTHONPATH"] = os.pathsep.join(pythonpath)
-        os.execve(run, [run] + argv, env)
+        pythonpath = self.package_dir + os.pathsep + self.dependencies_dir
+        if pythonpath_env := os.environ.get("PYTHONPATH"):
+            pythonpath += os.pathsep + pythonpath_env
+
+        env = {**os.environ, "PYK_VERSION": str(self.config["version"]), "PYTHONPATH": pythonpath}
+        os.execve(run, [run, *argv], env)
 
     async def wait_for_update(self):
-        version = await asyncio.to_thread(self.get_remote_version)
-        while True:
-            try:
-                response = await asyncio.to_thread(urllib.request.urlopen, self.url % "watch")
-                data = await asyncio.to_thread(json.load, response)
-                if version != data["version"]:
-                    return data
+        # Only watchers need asyncio. Everything sync() uses is imported at module level, it may
+        # run in a prefetch thread while the import hook holds the import lock.
+        # pylint:disable=import-outside-toplevel
+        import asyncio
 
-            except urllib.error.HTTPError as exc:
-                if exc.code == 404:
-                    raise NoSuchPackage() from exc
-                await asyncio.sleep(5)
+        version = await asyncio.to_thread(self.get_remote_version)
 
-            except http.client.RemoteDisconnected:
-                await asyncio.sleep(5)
+        # The watch requests block for up to a minute each, so they get a keep-alive connection
+        # of their own. The server answers right away if the version is no longer `since`.
+        conn = http.client.HTTPConnection(self._host, self._port)
+        path = f"{self.paths['watch']}?since={version}"
+        errors = 0
+        try:
+            while True:
+                try:
+                    status, data = await asyncio.to_thread(send_request, conn, path,
+                                                           {"Pyk-Node": NODE})
+                except (OSError, http.client.HTTPException):
+                    status = None
+
+                if status == 200:
+                    errors = 0
+                    data = json_loads(data)
+                    if version != data["version"]:
+                        return data
+                elif status == 404:
+                    raise NoSuchPackage()
+                else:
+                    await asyncio.sleep(min(300, 2 ** errors))
+                    errors += 1
+        finally:
+            conn.close()
 
 
 class ImportHook:
@@ -357,34 +657,113 @@ class ImportHook:
         elif not fullname.startswith(PACKAGE_NAME + "."):
             return None
 
-        name = fullname.split(".", 1)[1]
+        # Do not sync the package here, find_spec() is called with the global import lock held.
+        return Loader(fullname).spec
 
-        package = Package(name, lib=True)
+
+class Loader:
+    """Loader for pyk library modules. The package is synced when the module is executed, where
+       only the lock of this module is held, and the module's source file is then loaded by a
+       SourceFileLoader.
+    """
+
+    def __init__(self, fullname):
+        self.name = fullname.split(".", 1)[1]
+        self.spec = importlib.machinery.ModuleSpec(fullname, self)
+
+    def load(self):
+        """Sync the package, fill in the location of its module in the spec and return the
+           SourceFileLoader for it.
+        """
         try:
-            package.sync()
+            package = sync_library(self.name)
         except NoSuchPackage:
             # pylint:disable=raise-missing-from
-            raise ModuleNotFoundError(f"No pyk module named {name!r}")
+            raise ModuleNotFoundError(f"No pyk module named {self.name!r}")
 
         path = os.path.join(package.package_dir, package.config["lib"])
         if os.path.isdir(path):
+            self.spec.submodule_search_locations = [path]
             path = os.path.join(path, "__init__.py")
 
         sys.path.insert(0, package.dependencies_dir)
         sys.path.insert(0, package.package_dir)
 
-        loader = importlib.machinery.SourceFileLoader(fullname, path)
-        return importlib.util.spec_from_loader(fullname, loader=loader)
+        self.spec.loader = importlib.machinery.SourceFileLoader(self.spec.name, path)
+        self.spec.origin = path
+        self.spec.has_location = True
+        return self.spec.loader
+
+    def create_module(self, spec):
+        # pylint:disable=unused-argument
+        return None
+
+    def exec_module(self, module):
+        loader = self.load()
+        module.__loader__ = loader
+        module.__file__ = self.spec.origin
+        module.__cached__ = self.spec.cached
+        if self.spec.submodule_search_locations is not None:
+            module.__path__ = self.spec.submodule_search_locations
+            module.__package__ = self.spec.name
+        loader.exec_module(module)
+
+    def get_code(self, fullname):
+        # This is used by `python -m pyk.<name>`.
+        return self.load().get_code(fullname)
 
 
 sys.meta_path.append(ImportHook())
 
 
+def sync_library(name):
+    """Sync the library package name once per process and return its Package object. If the
+       package is being synced by another thread, wait for that to finish.
+    """
+    with _sync_lock:
+        if (future := _synced.get(name)) is None:
+            future = _synced[name] = concurrent.futures.Future()
+            owner = True
+        else:
+            owner = False
+
+    if owner:
+        package = Package(name, lib=True)
+        try:
+            package.sync()
+        except BaseException as exc:
+            # Do not remember the failure, the next import should try again.
+            with _sync_lock:
+                del _synced[name]
+            future.set_exception(exc)
+            raise
+        future.set_result(package)
+
+    return future.result()
+
+
+def prefetch(names):
+    """Sync several library packages in parallel before they are imported. The import hook
+       syncs packages one after the other, so `from pyk import a, b, c` takes the sum of the
+       individual sync times. Calling `prefetch(["a", "b", "c"])` first reduces that to the
+       time of the slowest package.
+    """
+    def sync(name):
+        try:
+            sync_library(name)
+        finally:
+            # The connections of a worker thread would be left open when the executor shuts
+            # down.
+            close_connections()
+
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        list(executor.map(sync, names))
+
+
 def pyk(name, module_name=None):
     if module_name is None:
         module_name = name
-    package = Package(name, lib=True)
-    package.sync()
+    package = sync_library(name)
     sys.path.insert(0, package.dependencies_dir)
     sys.path.insert(0, package.package_dir)
     return importlib.import_module(module_name)
@@ -36,7 +36,7 @@ import re
 import sys
 import json
 import socket
-import urllib
+import urllib.request
 import asyncio
 import sqlite3
 import tarfile
@@ -131,11 +131,10 @@ def build(argv):
     # Prepare the package data for upload to the repository.
     crypto = Crypto()
     data = crypto.encrypt(fobj.read())
-    data = json.dumps({"data": data.decode("ascii")}).encode("ascii")
 
     request = urllib.request.Request(
             f"http://{HOST}:{PORT}/upload/{type}/{name}", data=data,
-            headers={"Content-Type": "application/json", "Content-Length": len(data)})
+            headers={"Content-Type": "application/octet-stream", "Content-Length": len(data)})
     with urllib.request.urlopen(request) as uobj:
         json.load(uobj)
 
@@ -185,11 +184,10 @@ def remove(argv):
 
     crypto = Crypto()
     data = crypto.encrypt(f'{{"type": "{args.type}", "name": "{args.name}"}}'.encode("utf-8"))
-    data = json.dumps({"data": data.decode("ascii")}).encode("ascii")
 
     request = urllib.request.Request(
             f"http://{HOST}:{PORT}/remove", data=data,
-            headers={"Content-Type": "application/json", "Content-Length": len(data)})
+            headers={"Content-Type": "application/octet-stream", "Content-Length": len(data)})
     with urllib.request.urlopen(request) as uobj:
         print(json.load(uobj))
 
@@ -295,8 +293,7 @@ def serve(argv):
             type = request.match_info["type"]
             name = request.match_info["name"]
 
-            data = json.loads(await request.read())
-            data = self.crypto.decrypt(data["data"])
+            data = self.crypto.decrypt(await request.read())
 
             config = Package.extract_config(data)
             version = config["version"]
@@ -339,14 +336,13 @@ def serve(argv):
                     "select version, data from pkg where type = ? and name = ?", (type, name)):
                 self.log(f"node {node!r} downloading {'library' if type == 'lib' else 'runner'} "\
                         f"package {name} v{version}")
-                data = self.crypto.encrypt(data)
-                return web.json_response({"data": data.decode("ascii")})
+                return web.Response(body=self.crypto.encrypt(data),
+                                    content_type="application/octet-stream")
             else:
                 return web.HTTPNotFound()
 
         async def remove(self, request):
-            data = json.loads(await request.read())
-            data = json.loads(self.crypto.decrypt(data["data"]))
+            data = json.loads(self.crypto.decrypt(await request.read()))
 
             type = data["type"]
             name = data["name"]
@@ -362,17 +358,20 @@ def serve(argv):
         async def watch(self, request):
             type = request.match_info["type"]
             name = request.match_info["name"]
+            since = request.query.get("since")
             queue = asyncio.Queue()
 
             for version, date in self.conn.execute(
                     "select version, date from pkg where type = ? and name = ?", (type, name,)):
-                self.watches[queue] = (type, name)
-                try:
-                    version, date = await asyncio.wait_for(queue.get(), timeout=60)
-                except TimeoutError:
-                    pass
-
-                del self.watches[queue]
+                # Only wait if the client already knows the current version.
+                if since is None or since == str(version):
+                    self.watches[queue] = (type, name)
+                    try:
+                        version, date = await asyncio.wait_for(queue.get(), timeout=60)
+                    except TimeoutError:
+                        pass
+
+                    del self.watches[queue]
                 return web.json_response({"type": type, "name": name, "version": version,
                                           "date": date})
             else: